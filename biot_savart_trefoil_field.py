@@ -0,0 +1,396 @@
+"""
+biot_savart_trefoil_field.py
+================================================================
+Campo magnetico (o gravitomagnetico B_g, cambiando la costante di
+accoppiamento) generato da correnti lungo il nodo trifoglio primordiale
+trefoil() e da spire toroidali, calcolato su griglie 3D.
+
+- Kernel esatto di Biot–Savart per segmento finito, vettorizzato a blocchi.
+- Per M segmenti × N punti nell'ordine 1e5–1e6 si usa un treecode
+  Barnes–Hut (octree sui segmenti, espansione multipolare al secondo
+  ordine nelle posizioni dei segmenti) con criterio di apertura θ calibrabile su una
+  tolleranza d'errore relativa punto per punto (con pavimento assoluto)
+  stimata contro il calcolo diretto.
+- L'output su griglia va in array memory-mapped (.npy), scritto a blocchi:
+  mappe di campo per geometrie di scala reticolare stanno su un solo nodo.
+
+Autore: Tetcollective collab
+Data: 2026
+"""
+
+import time
+import warnings
+
+import numpy as np
+
+# --------------------------------------------------
+# Costanti
+# --------------------------------------------------
+MU0         = 4e-7 * np.pi            # permeabilità del vuoto [T·m/A]
+KAPPA_MAG   = MU0 / (4 * np.pi)       # prefattore Biot–Savart magnetico
+G_NEWTON    = 6.674e-11
+C_LIGHT     = 2.998e8
+KAPPA_GRAV  = G_NEWTON / C_LIGHT**2   # analogo gravitomagnetico (B_g, convenzione GEM)
+
+BLOCK_ELEMS = 2_000_000               # coppie punto×segmento per blocco vettoriale
+
+
+# --------------------------------------------------
+# Geometrie di corrente
+# --------------------------------------------------
+def trefoil(t, scale=3.0):
+    x = scale * (np.sin(t) + 2 * np.sin(2*t))
+    y = scale * (np.cos(t) - 2 * np.cos(2*t))
+    z = scale * (-np.sin(3*t))
+    return np.array([x, y, z])
+
+
+def closed_curve_segments(points, current=1.0):
+    """Polilinea chiusa (3, n) -> estremi dei segmenti a, b (n, 3) e correnti (n,)."""
+    a = np.ascontiguousarray(np.asarray(points, dtype=float).T)
+    b = np.roll(a, -1, axis=0)
+    return a, b, np.full(len(a), float(current))
+
+
+def trefoil_segments(n_seg=2000, scale=3.0, current=1.0):
+    t = np.linspace(0, 2 * np.pi, n_seg, endpoint=False)
+    return closed_curve_segments(trefoil(t, scale), current)
+
+
+def torus_loop_segments(R0=6.0, a_minor=2.0, n_loops=24, n_seg=128, current=1.0):
+    """Avvolgimento toroidale: n_loops spire poloidali attorno al toro (R0, a_minor)."""
+    u = np.linspace(0, 2 * np.pi, n_loops, endpoint=False)
+    v = np.linspace(0, 2 * np.pi, n_seg, endpoint=False)
+    parts = []
+    for uk in u:
+        rho = R0 + a_minor * np.cos(v)
+        loop = np.array([rho * np.cos(uk), rho * np.sin(uk), a_minor * np.sin(v)])
+        parts.append(closed_curve_segments(loop, current))
+    return concat_segments(*parts)
+
+
+def concat_segments(*parts):
+    a, b, cur = zip(*parts)
+    return np.concatenate(a), np.concatenate(b), np.concatenate(cur)
+
+
+# --------------------------------------------------
+# Kernel esatto per segmento finito
+# B = κ I (r1 × r2)(|r1| + |r2|) / (|r1||r2|(|r1||r2| + r1·r2)),  r1 = x - a, r2 = x - b
+# --------------------------------------------------
+def _segment_kernel(x, a, b, current, eps=1e-12):
+    """
+    Kernel esatto per componenti (array separati: più veloce di assi da 3).
+    x, a, b: tuple di 3 array broadcastabili; somma sull'ultimo asse.
+    """
+    r1 = [x[k] - a[k] for k in range(3)]
+    r2 = [x[k] - b[k] for k in range(3)]
+    n1 = np.sqrt(r1[0]**2 + r1[1]**2 + r1[2]**2)
+    n2 = np.sqrt(r2[0]**2 + r2[1]**2 + r2[2]**2)
+    n12 = n1 * n2
+    denom = n12 * (n12 + r1[0]*r2[0] + r1[1]*r2[1] + r1[2]*r2[2])
+    ok = denom > eps * (n1 + n2) ** 4          # punto sulla retta del segmento -> 0
+    factor = np.where(ok, current * (n1 + n2) / np.where(ok, denom, 1.0), 0.0)
+    return np.stack([((r1[1]*r2[2] - r1[2]*r2[1]) * factor).sum(axis=-1),
+                     ((r1[2]*r2[0] - r1[0]*r2[2]) * factor).sum(axis=-1),
+                     ((r1[0]*r2[1] - r1[1]*r2[0]) * factor).sum(axis=-1)], axis=-1)
+
+
+def field_direct(targets, a, b, current, kappa=KAPPA_MAG):
+    """Somma esatta O(N·M), a blocchi di punti per limitare la memoria."""
+    targets = np.asarray(targets, dtype=float)
+    out = np.zeros_like(targets)
+    step = max(1, BLOCK_ELEMS // max(1, len(a)))
+    for s in range(0, len(targets), step):
+        x = targets[s:s + step].T[:, :, None]
+        out[s:s + step] = _segment_kernel(x, a.T, b.T, current)
+    return kappa * out
+
+
+# --------------------------------------------------
+# Treecode Barnes–Hut sui segmenti
+# --------------------------------------------------
+def _antisym(T):
+    """Σ dl × d dalla contrazione sugli ultimi due indici (d, dl) di un tensore."""
+    return np.stack([T[..., 2, 1] - T[..., 1, 2],
+                     T[..., 0, 2] - T[..., 2, 0],
+                     T[..., 1, 0] - T[..., 0, 1]], axis=-1)
+
+
+def build_tree(a, b, current, leaf_size=32):
+    """
+    Octree sui punti medi y dei segmenti. Per ogni nodo (centro c, d = y - c):
+    raggio che contiene interamente i segmenti e momenti
+        J = Σ I dl,   M_jk = Σ I d_j dl_k,   Q_ijk = Σ I d_i d_j dl_k
+    (Q include il contributo h⊗h/3 dell'estensione del segmento, h = dl/2).
+    """
+    mid = 0.5 * (a + b)
+    h = 0.5 * (b - a)
+    dl = (b - a) * current[:, None]
+    half_len = np.linalg.norm(h, axis=1)
+    perm = np.arange(len(a))
+
+    lo, hi = mid.min(axis=0), mid.max(axis=0)
+    nodes = []                                   # [centro, start, end, figli]
+
+    def split(center, half, s, e):
+        k = len(nodes)
+        nodes.append([center, s, e, None])
+        if e - s <= leaf_size or half < 1e-12:
+            return k
+        idx = perm[s:e]
+        octant = ((mid[idx] > center) * np.array([1, 2, 4])).sum(axis=1)
+        order = np.argsort(octant, kind='stable')
+        perm[s:e] = idx[order]
+        counts = np.bincount(octant, minlength=8)
+        children, pos = [], s
+        for o in range(8):
+            if counts[o]:
+                shift = np.array([(o >> i) & 1 for i in range(3)]) - 0.5
+                children.append(split(center + shift * half, half / 2, pos, pos + counts[o]))
+                pos += counts[o]
+        nodes[k][3] = children
+        return k
+
+    split(0.5 * (lo + hi), 0.5 * (hi - lo).max() + 1e-12, 0, len(a))
+
+    n = len(nodes)
+    tree = {
+        'center':   np.array([nd[0] for nd in nodes]),
+        'children': np.full((n, 8), -1),
+        'radius':   np.empty(n),
+        'J':        np.empty((n, 3)),
+        'M':        np.empty((n, 3, 3)),
+        'Q':        np.empty((n, 3, 3, 3)),
+        'a': a, 'b': b, 'current': current,
+    }
+    y, hh, w, hl = mid[perm], h[perm], dl[perm], half_len[perm]
+    for k, (c, s, e, children) in enumerate(nodes):
+        if children:
+            tree['children'][k, :len(children)] = children
+        d = y[s:e] - c
+        tree['radius'][k] = (np.linalg.norm(d, axis=1) + hl[s:e]).max()
+        tree['J'][k] = w[s:e].sum(axis=0)
+        tree['M'][k] = d.T @ w[s:e]
+        dd = d[:, :, None] * d[:, None, :] + hh[s:e, :, None] * hh[s:e, None, :] / 3
+        tree['Q'][k] = np.einsum('nij,nk->ijk', dd, w[s:e])
+    tree['W'] = _antisym(tree['M'])              # Σ I dl × d
+    tree['T'] = _antisym(tree['Q'])              # T_i = Σ I d_i (dl × d)
+    tree['S'] = np.einsum('niik->nk', tree['Q'])  # Σ I |d|² dl
+    tree['is_leaf'] = tree['children'][:, 0] < 0
+
+    # tabella dei segmenti per foglia, con segmento fittizio (I = 0) di padding
+    leaves = np.flatnonzero(tree['is_leaf'])
+    width = max(nodes[k][2] - nodes[k][1] for k in leaves)
+    table = np.full((n, width), len(a))
+    for k in leaves:
+        s, e = nodes[k][1], nodes[k][2]
+        table[k, :e - s] = perm[s:e]
+    tree['leaf_segments'] = table
+    return tree
+
+
+def _scatter_add(out, idx, vals):
+    for k in range(3):
+        out[:, k] += np.bincount(idx, weights=vals[:, k], minlength=len(out))
+
+
+def _far_field(tree, nodes, R, dist):
+    """
+    Espansione di Σ I dl × (R - d)/|R - d|³ fino al secondo ordine in d:
+        J × R/r³ − w/r³ + 3 (Mᵀ R) × R/r⁵
+        − 3 (R·T)/r⁵ − (3/2) S × R/r⁵ + (15/2) (Q:RR) × R/r⁷
+    """
+    inv3 = dist ** -3
+    inv5 = inv3 / dist ** 2
+    Rrow = R[:, None, :]
+    v = (Rrow @ tree['M'][nodes])[:, 0]
+    rt = (Rrow @ tree['T'][nodes])[:, 0]
+    RR = (R[:, :, None] * Rrow).reshape(-1, 1, 9)
+    u = (RR @ tree['Q'][nodes].reshape(-1, 9, 3))[:, 0]
+    return ((np.cross(tree['J'][nodes], R) - tree['W'][nodes]) * inv3[:, None]
+            + (3 * np.cross(v, R) - 3 * rt - 1.5 * np.cross(tree['S'][nodes], R))
+            * inv5[:, None]
+            + 7.5 * np.cross(u, R) * (inv5 / dist ** 2)[:, None])
+
+
+def field_tree(targets, tree, theta=0.4, kappa=KAPPA_MAG, block=4096):
+    """
+    Treecode: coppie (punto, nodo) espanse livello per livello. Se
+    raggio/distanza < θ si usa l'espansione multipolare (_far_field),
+    altrimenti si scende ai figli; sulle foglie vicine si usa il kernel esatto.
+    """
+    targets = np.asarray(targets, dtype=float)
+    out = np.zeros_like(targets)
+    a_pad = np.vstack([tree['a'], np.zeros(3)]).T
+    b_pad = np.vstack([tree['b'], np.zeros(3)]).T
+    cur_pad = np.append(tree['current'], 0.0)
+    width = tree['leaf_segments'].shape[1]
+    step = max(1, BLOCK_ELEMS // width)
+
+    for s in range(0, len(targets), block):
+        x = targets[s:s + block]
+        bx = np.zeros_like(x)
+        pt = np.arange(len(x))
+        pn = np.zeros(len(x), dtype=int)
+        while len(pt):
+            R = x[pt] - tree['center'][pn]
+            dist = np.linalg.norm(R, axis=1)
+            far = tree['radius'][pn] < theta * dist
+            if far.any():
+                _scatter_add(bx, pt[far], _far_field(tree, pn[far], R[far], dist[far]))
+
+            near = ~far
+            leaf = near & tree['is_leaf'][pn]
+            lt, ln = pt[leaf], pn[leaf]
+            for q in range(0, len(lt), step):
+                seg = tree['leaf_segments'][ln[q:q + step]]
+                xq = x[lt[q:q + step]].T[:, :, None]
+                bl = _segment_kernel(xq, a_pad[:, seg], b_pad[:, seg], cur_pad[seg])
+                _scatter_add(bx, lt[q:q + step], bl)
+
+            inner = near & ~tree['is_leaf'][pn]
+            ch = tree['children'][pn[inner]]
+            mask = ch >= 0
+            pt = np.repeat(pt[inner], mask.sum(axis=1))
+            pn = ch[mask]
+        out[s:s + block] = bx
+    return kappa * out
+
+
+def tree_error(tree, sample, theta, exact=None, floor=1e-2):
+    """
+    Errore del treecode su un campione: massimo dell'errore relativo punto per
+    punto |ΔB| / max(|B|, floor · mediana|B|). Il pavimento assoluto evita che
+    i punti dove il campo quasi si annulla dominino la stima.
+    """
+    if exact is None:
+        exact = field_direct(sample, tree['a'], tree['b'], tree['current'], kappa=1.0)
+    mod = np.linalg.norm(exact, axis=1)
+    scale = np.maximum(mod, floor * np.median(mod)) + 1e-300
+    approx = field_tree(sample, tree, theta=theta, kappa=1.0)
+    return (np.linalg.norm(approx - exact, axis=1) / scale).max()
+
+
+def calibrate_theta(tree, targets, tol=1e-3, theta0=0.6, n_sample=256, seed=0,
+                    theta_min=0.05):
+    """
+    Controllo d'errore: riduce θ finché tree_error sul campione casuale è < tol.
+    Ritorna (θ, errore stimato, convergito); se θ scende sotto theta_min senza
+    raggiungere tol viene emesso un warning.
+    """
+    rng = np.random.default_rng(seed)
+    targets = np.asarray(targets, dtype=float)
+    sample = targets[rng.choice(len(targets), min(n_sample, len(targets)), replace=False)]
+    exact = field_direct(sample, tree['a'], tree['b'], tree['current'], kappa=1.0)
+    theta = theta0
+    while True:
+        err = tree_error(tree, sample, theta, exact)
+        if err < tol:
+            return theta, err, True
+        if theta * 0.7 < theta_min:
+            warnings.warn(f"calibrate_theta: tolleranza {tol:.1e} non raggiunta "
+                          f"(errore {err:.2e} con θ = {theta:.3f})", RuntimeWarning)
+            return theta, err, False
+        theta *= 0.7
+
+
+# --------------------------------------------------
+# Campo su griglia 3D con output memory-mapped
+# --------------------------------------------------
+def field_on_grid(segments, axes, out_path=None, kappa=KAPPA_MAG, tol=1e-3,
+                  theta=None, dtype=np.float32, direct_limit=5e7, rows=None):
+    """
+    Campo su griglia (len(x), len(y), len(z), 3). Con out_path l'array è un
+    .npy memory-mapped, scritto piano per piano (non si materializza la griglia).
+    Diretto esatto se N·M < direct_limit, altrimenti treecode con θ calibrato.
+    """
+    a, b, current = segments
+    xs, ys, zs = (np.asarray(ax, dtype=float) for ax in axes)
+    shape = (len(xs), len(ys), len(zs), 3)
+    if out_path is None:
+        field = np.zeros(shape, dtype=dtype)
+    else:
+        field = np.lib.format.open_memmap(out_path, mode='w+', dtype=dtype, shape=shape)
+
+    n_targets = len(xs) * len(ys) * len(zs)
+    use_tree = n_targets * len(a) >= direct_limit
+    info = {'method': 'tree' if use_tree else 'direct', 'theta': None,
+            'est_rel_err': 0.0, 'converged': True}
+    if use_tree:
+        tree = build_tree(a, b, current)
+        rng = np.random.default_rng(1)
+        sample = np.column_stack([rng.choice(xs, 256), rng.choice(ys, 256), rng.choice(zs, 256)])
+        if theta is None:
+            theta, err, converged = calibrate_theta(tree, sample, tol=tol)
+        else:
+            err = tree_error(tree, sample, theta)
+            converged = err < tol
+            if not converged:
+                warnings.warn(f"field_on_grid: θ = {theta} dà errore stimato {err:.2e} "
+                              f"> tol {tol:.1e}", RuntimeWarning)
+        info['est_rel_err'] = err
+        info['converged'] = converged
+        info['theta'] = theta
+
+    rows = rows or max(1, 262_144 // (len(ys) * len(zs)))
+    Y, Z = np.meshgrid(ys, zs, indexing='ij')
+    for i in range(0, len(xs), rows):
+        xi = xs[i:i + rows]
+        pts = np.column_stack([np.repeat(xi, Y.size),
+                               np.tile(Y.ravel(), len(xi)),
+                               np.tile(Z.ravel(), len(xi))])
+        if use_tree:
+            B = field_tree(pts, tree, theta=theta, kappa=kappa)
+        else:
+            B = field_direct(pts, a, b, current, kappa=kappa)
+        field[i:i + len(xi)] = B.reshape(len(xi), len(ys), len(zs), 3)
+
+    if out_path is not None:
+        field.flush()
+    return field, info
+
+
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    # --------------------------------------------------
+    # Sorgenti: trifoglio (scala 3) + avvolgimento toroidale
+    # --------------------------------------------------
+    I_trefoil = 1.0e3                     # A
+    I_torus   = 2.0e2                     # A
+    segments = concat_segments(trefoil_segments(n_seg=20000, current=I_trefoil),
+                               torus_loop_segments(n_loops=64, n_seg=512, current=I_torus))
+    print(f"Segmenti: {len(segments[0])}")
+
+    n = 96
+    axes = [np.linspace(-14, 14, n)] * 3
+    t0 = time.time()
+    B, info = field_on_grid(segments, axes, out_path='trefoil_field_B.npy', tol=1e-3)
+    print(f"Campo su {n}^3 punti ({info['method']}, θ = {info['theta']}, "
+          f"errore rel. stimato {info['est_rel_err']:.2e}, "
+          f"convergito: {info['converged']}) in {time.time() - t0:.1f} s")
+
+    # --------------------------------------------------
+    # Plot: piano z = 0, |B| e linee di campo
+    # --------------------------------------------------
+    k0 = n // 2
+    xs, ys = axes[0], axes[1]
+    Bx, By = B[:, :, k0, 0].T, B[:, :, k0, 1].T
+    Bmod = np.linalg.norm(B[:, :, k0, :], axis=-1).T
+
+    fig, ax = plt.subplots(figsize=(8, 7))
+    im = ax.pcolormesh(xs, ys, np.log10(Bmod + 1e-30), cmap='magma', shading='auto')
+    ax.streamplot(xs, ys, Bx, By, color='white', density=1.4, linewidth=0.6)
+    tt = np.linspace(0, 2 * np.pi, 1000)
+    pos = trefoil(tt)
+    ax.plot(pos[0], pos[1], color='cyan', lw=1.2, alpha=0.7, label='Trifoglio (proiezione)')
+    fig.colorbar(im, ax=ax, label='log₁₀ |B| [T]')
+    ax.set_xlabel('X'); ax.set_ylabel('Y')
+    ax.set_title('Campo di Biot–Savart: trifoglio + toroide di plasma (z = 0)')
+    ax.legend(loc='upper right', fontsize=9)
+    ax.set_aspect('equal')
+
+    plt.tight_layout()
+    plt.savefig('biot_savart_trefoil_field.png', dpi=180, bbox_inches='tight')
+    plt.show()
@@ -0,0 +1,374 @@
+"""
+jones_trefoil_fibonacci.py
+================================================================
+Motore per invarianti di nodo (bracket di Kauffman / polinomio di Jones)
+valutati alla radice dell'unità di Fibonacci t = e^{iπ/5}, da confrontare con
+le fasi R_τ = e^{-3πi/5} usate in phase_accumulation_vs_Lk.py.
+
+Input: parole di treccia (σ_i → +i, σ_i^{-1} → -i) oppure codici PD
+X[a,b,c,d] (convenzione KnotTheory: a = sotto-strand entrante, ordine antiorario).
+
+Il bracket NON usa la somma sui 2^c stati: i crossing vengono contratti uno
+alla volta (decomposizione in tangle) e gli stati parziali con la stessa
+connettività di frontiera vengono fusi (programmazione dinamica memoizzata).
+Il costo cresce con il numero di Catalan della larghezza di frontiera, non con
+2^c: trecce/toroidali T(p,q) con 30+ crossing restano trattabili.
+
+I risultati sono salvati in un catalogo JSON persistente (jones_catalogue.json).
+
+Autore: Tetcollective collab
+Data: 2026
+"""
+
+import json
+import os
+from fractions import Fraction
+
+import numpy as np
+
+# --------------------------------------------------
+# Parametri di riferimento
+# --------------------------------------------------
+theta_fib      = np.pi / 5                       # t = e^{iπ/5}
+R_tau_phase    = np.exp(-1j * 3 * np.pi / 5)     # fase anyonica Fibonacci
+catalogue_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              "jones_catalogue.json")
+
+# Loop chiuso: d = -A^2 - A^{-2}  (polinomi di Laurent in A come dict exp -> coeff)
+LOOP_VALUE = {2: -1, -2: -1}
+
+
+# --------------------------------------------------
+# Aritmetica dei polinomi di Laurent (interi)
+# --------------------------------------------------
+def poly_mul(p, q):
+    out = {}
+    for ea, ca in p.items():
+        for eb, cb in q.items():
+            out[ea + eb] = out.get(ea + eb, 0) + ca * cb
+    return {e: c for e, c in out.items() if c != 0}
+
+
+def poly_add_into(dst, src, shift=0):
+    """dst += A^shift · src (in place)."""
+    for e, c in src.items():
+        k = e + shift
+        v = dst.get(k, 0) + c
+        if v:
+            dst[k] = v
+        else:
+            dst.pop(k, None)
+
+
+def poly_div_loop(p):
+    """Divisione esatta per d = -A^2 - A^{-2} (normalizza il nodo banale a 1)."""
+    rem = dict(p)
+    quot = {}
+    while rem:
+        top = max(rem)
+        c = -rem[top]                 # coefficiente di A^{top-2} nel quoziente
+        quot[top - 2] = c
+        poly_add_into(rem, {0: c, -4: c}, shift=top)   # rem -= c·A^{top-2}·d
+    return quot
+
+
+_loop_powers = [{0: 1}]
+
+
+def loop_power(k):
+    while len(_loop_powers) <= k:
+        _loop_powers.append(poly_mul(_loop_powers[-1], LOOP_VALUE))
+    return _loop_powers[k]
+
+
+# --------------------------------------------------
+# Conversioni: treccia → codice PD
+# --------------------------------------------------
+def braid_to_pd(word, n_strands=None):
+    """
+    Chiusura di una treccia orientata verso l'alto.
+    σ_i positivo: sopra-strand da SW a NE → X[SE, NE, NW, SW].
+    σ_i negativo: sopra-strand da SE a NW → X[SW, SE, NE, NW].
+    """
+    word = [int(s) for s in word]
+    if not word or 0 in word:
+        raise ValueError("la parola di treccia deve contenere generatori non nulli")
+    n = n_strands or max(abs(s) for s in word) + 1
+    if max(abs(s) for s in word) >= n:
+        raise ValueError(f"generatore fuori range per {n} strand")
+
+    cur = list(range(1, n + 1))
+    next_label = n + 1
+    crossings = []
+    for s in word:
+        i = abs(s) - 1
+        left_in, right_in = cur[i], cur[i + 1]
+        left_out, right_out = next_label, next_label + 1
+        next_label += 2
+        if s > 0:
+            crossings.append([right_in, right_out, left_out, left_in])
+        else:
+            crossings.append([left_in, right_in, right_out, left_out])
+        # lo strand da sinistra finisce a destra e viceversa
+        cur[i], cur[i + 1] = left_out, right_out
+
+    if any(cur[k] == k + 1 for k in range(n)):
+        raise ValueError("strand senza crossing (componente banale separata)")
+
+    # chiusura: le etichette finali coincidono con quelle iniziali
+    closure = {cur[k]: k + 1 for k in range(n)}
+    pd = [[closure.get(e, e) for e in x] for x in crossings]
+    return relabel_pd(pd)
+
+
+def torus_knot_braid(p, q):
+    """T(p,q) come chiusura di (σ_1 σ_2 ... σ_{p-1})^q su p strand."""
+    if p < 2 or q == 0:
+        raise ValueError("T(p,q) richiede p >= 2 e q != 0")
+    sign = 1 if q > 0 else -1
+    return [sign * i for i in range(1, p)] * abs(q)
+
+
+def relabel_pd(pd):
+    """Etichette consecutive 1..2c nell'ordine di apparizione."""
+    mapping = {}
+    for x in pd:
+        for e in x:
+            if e not in mapping:
+                mapping[e] = len(mapping) + 1
+    return [[mapping[e] for e in x] for x in pd]
+
+
+def pd_key(pd):
+    return json.dumps(relabel_pd(pd))
+
+
+# --------------------------------------------------
+# Writhe (orientazione ricostruita percorrendo le componenti)
+# --------------------------------------------------
+def writhe(pd):
+    where = {}
+    for ci, x in enumerate(pd):
+        for pos, e in enumerate(x):
+            where.setdefault(e, []).append((ci, pos))
+    for e, occ in where.items():
+        if len(occ) != 2:
+            raise ValueError(f"codice PD non valido: l'arco {e} compare {len(occ)} volte")
+
+    over_entry = {}
+    visited = set()
+    # prima le componenti che passano sotto (orientazione fissata da a -> c)
+    starts = [(ci, 0) for ci in range(len(pd))]
+    starts += [(ci, pos) for ci in range(len(pd)) for pos in (1, 3)]
+    for start in starts:
+        if start in visited:
+            continue
+        ci, pos = start
+        while (ci, pos) not in visited:
+            visited.add((ci, pos))
+            if pos in (1, 3):
+                over_entry.setdefault(ci, pos)
+            out_pos = (pos + 2) % 4
+            visited.add((ci, out_pos))
+            e = pd[ci][out_pos]
+            a, b = where[e]
+            ci, pos = b if a == (ci, out_pos) else a
+
+    # positivo se il sopra-strand entra da d (posizione 3)
+    return sum(1 if over_entry[ci] == 3 else -1 for ci in range(len(pd)))
+
+
+# --------------------------------------------------
+# Bracket di Kauffman: DP su decomposizione in tangle
+# --------------------------------------------------
+def crossing_order(pd):
+    """Ordine greedy che massimizza gli archi già in frontiera (frontiera stretta)."""
+    remaining = set(range(len(pd)))
+    frontier = set()
+    order = []
+    while remaining:
+        best = min(remaining,
+                   key=lambda ci: (-sum(1 for e in pd[ci] if e in frontier), ci))
+        remaining.remove(best)
+        order.append(best)
+        for e in pd[best]:
+            frontier ^= {e}
+    return order
+
+
+def _glue(partner, x, y):
+    """Aggiunge l'arco x–y alla frontiera; ritorna il numero di loop chiusi."""
+    if x == y:
+        return 1
+    left = x
+    if x in partner:
+        left = partner.pop(x)
+        del partner[left]
+        if left == y:
+            return 1
+    right = y
+    if y in partner:
+        right = partner.pop(y)
+        del partner[right]
+    partner[left] = right
+    partner[right] = left
+    return 0
+
+
+_transition_cache = {}
+
+
+def _smooth(state, pairs):
+    """Transizione memoizzata: (connettività di frontiera, smoothing) -> (nuova, loop)."""
+    key = (state, pairs)
+    hit = _transition_cache.get(key)
+    if hit is None:
+        partner = {}
+        for a, b in state:
+            partner[a] = b
+            partner[b] = a
+        loops = sum(_glue(partner, x, y) for x, y in pairs)
+        new_state = tuple(sorted((a, b) for a, b in partner.items() if a < b))
+        hit = (new_state, loops)
+        _transition_cache[key] = hit
+    return hit
+
+
+def kauffman_bracket(pd):
+    """
+    <K> non normalizzato (ogni loop vale d), con
+    <X[a,b,c,d]> = A <(a,b)(c,d)> + A^{-1} <(a,d)(b,c)>.
+    """
+    states = {(): {0: 1}}
+    for ci in crossing_order(pd):
+        a, b, c, d = pd[ci]
+        smoothings = ((((a, b), (c, d)), 1), (((a, d), (b, c)), -1))
+        new_states = {}
+        for state, poly in states.items():
+            for pairs, shift in smoothings:
+                new_state, loops = _smooth(state, pairs)
+                term = poly_mul(poly, loop_power(loops)) if loops else poly
+                poly_add_into(new_states.setdefault(new_state, {}), term, shift)
+        states = {s: p for s, p in new_states.items() if p}
+    return states.get((), {})
+
+
+def jones_polynomial(pd):
+    """
+    V(t) = (-A^3)^{-w} <K> / d  con A = t^{-1/4}.
+    Ritorna dict {esponente in quarti di t: coefficiente}.
+    """
+    if not pd:
+        return {0: 1}
+    w = writhe(pd)
+    normalized = poly_div_loop(kauffman_bracket(pd))
+    sign = -1 if w % 2 else 1
+    return {-(e - 3 * w): sign * c for e, c in normalized.items()}
+
+
+def jones_to_str(jones, var="t"):
+    terms = []
+    for q in sorted(jones):
+        e = Fraction(q, 4)
+        terms.append(f"{jones[q]:+d}" + (f"·{var}^{e}" if e else ""))
+    return " ".join(terms) if terms else "0"
+
+
+# --------------------------------------------------
+# Valutazione batch a t = e^{iθ}
+# --------------------------------------------------
+def jones_evaluate(polys, theta=theta_fib):
+    """
+    Valuta una lista di polinomi di Jones su un array di angoli θ (t = e^{iθ},
+    t^{q/4} = e^{iθq/4}). Ritorna array complesso (len(polys), len(theta)).
+    """
+    theta = np.atleast_1d(np.asarray(theta, dtype=float))
+    out = np.empty((len(polys), theta.size), dtype=complex)
+    for k, jones in enumerate(polys):
+        exps = np.fromiter(jones.keys(), dtype=float, count=len(jones)) / 4
+        coeffs = np.fromiter(jones.values(), dtype=float, count=len(jones))
+        out[k] = np.exp(1j * np.outer(theta, exps)) @ coeffs
+    return out
+
+
+# --------------------------------------------------
+# Catalogo persistente
+# --------------------------------------------------
+def load_catalogue(path=catalogue_path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def save_catalogue(catalogue, path=catalogue_path):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(catalogue, fh, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def catalogue_jones(pd, catalogue, name=None):
+    """Jones di `pd` dal catalogo (chiave = PD rietichettato), calcolato se assente."""
+    key = pd_key(pd)
+    entry = catalogue.get(key)
+    if entry is None:
+        jones = jones_polynomial(pd)
+        entry = {"name": name, "crossings": len(pd), "writhe": writhe(pd),
+                 "jones": {str(q): c for q, c in sorted(jones.items())}}
+        catalogue[key] = entry
+    elif name and not entry.get("name"):
+        entry["name"] = name
+    return {int(q): c for q, c in entry["jones"].items()}
+
+
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    # --------------------------------------------------
+    # Catalogo: trifoglio e nodi toroidali T(p,q)
+    # --------------------------------------------------
+    knots = {"3_1 (PD KnotTheory)": [[1, 4, 2, 5], [3, 6, 4, 1], [5, 2, 6, 3]],
+             "4_1 (PD KnotTheory)": [[4, 2, 5, 1], [8, 6, 1, 5], [6, 3, 7, 4], [2, 7, 3, 8]]}
+    for p, q in [(2, 3), (2, 5), (2, 7), (3, 4), (3, 5), (2, 11), (3, 7),
+                 (4, 5), (2, 31), (3, 16), (4, 11), (5, 8)]:
+        knots[f"T({p},{q})"] = braid_to_pd(torus_knot_braid(p, q))
+
+    catalogue = load_catalogue()
+    names = list(knots)
+    polys = [catalogue_jones(knots[nm], catalogue, name=nm) for nm in names]
+    save_catalogue(catalogue)
+
+    values = jones_evaluate(polys, theta_fib)[:, 0]
+    print(f"{'nodo':<22}{'c':>4}{'w':>5}   V(e^{{iπ/5}})")
+    for nm, pd, v in zip(names, (knots[n] for n in names), values):
+        print(f"{nm:<22}{len(pd):>4}{writhe(pd):>5}   "
+              f"|V| = {abs(v):.6f}  arg = {np.angle(v):+.6f} rad")
+    print("Trifoglio T(2,3):", jones_to_str(polys[names.index("T(2,3)")]))
+
+    # --------------------------------------------------
+    # Confronto con la fase R_τ per crossing del modello
+    # --------------------------------------------------
+    crossings = np.array([len(knots[nm]) for nm in names])
+    model_phase = np.angle(R_tau_phase ** crossings)
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(13, 5))
+    ax1.plot(crossings, np.abs(values), 'o', color='darkviolet')
+    for nm, c, v in zip(names, crossings, values):
+        ax1.annotate(nm.split()[0], (c, abs(v)), fontsize=8,
+                     xytext=(3, 3), textcoords='offset points')
+    ax1.set_xlabel('Numero di crossing')
+    ax1.set_ylabel('|V(e^{iπ/5})|')
+    ax1.set_title('Modulo del polinomio di Jones alla radice di Fibonacci')
+    ax1.grid(True, alpha=0.3)
+
+    ax2.plot(crossings, np.angle(values), 'd', color='darkred', label='arg V(e^{iπ/5})')
+    ax2.plot(crossings, model_phase, 'x', color='teal', label='arg R_τ^c (modello)')
+    ax2.set_xlabel('Numero di crossing')
+    ax2.set_ylabel('Fase [rad]')
+    ax2.set_title('Fase topologica vs fase anyonica accumulata')
+    ax2.legend(); ax2.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig('jones_fibonacci_catalogue.png', dpi=180, bbox_inches='tight')
+    plt.show()
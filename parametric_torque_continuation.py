@@ -0,0 +1,463 @@
+"""
+parametric_torque_continuation.py
+================================================================
+Sweep a continuazione per le griglie g × ω e g × fattore aureo di
+parametric_torque_grid.py: invece di ripartire da [0.0] in ogni cella
+(primo passo scelto da zero, stesso profilo di passo riscoperto ogni volta)
+la griglia viene percorsa in ordine che preserva la località
+(serpentina o curva di Hilbert) e ogni cella riusa le celle già risolte:
+
+- predittore/correttore: prima si integra una sottogriglia grossolana, poi
+  la soluzione θ(t) delle altre celle (output denso su t_eval dei nodi vicini)
+  viene interpolata lungo riga o colonna con differenze divise di Newton; il
+  termine quadratico e lo scarto fra stencil a destra e a sinistra stimano
+  l'errore della correzione perturbativa. Se è entro la tolleranza la cella
+  non viene integrata affatto.
+- warm start: se la correzione non basta, RK45 ripercorre la griglia di passi
+  accettati di una cella integrata vicina (primo passo incluso), evitando
+  la scelta iniziale e i passi rifiutati attorno alle discontinuità di arg();
+  la direzione di riuso si adatta a quanto il replay ha reso finora.
+  Il replay imposta RK45.h_abs, attributo non documentato di SciPy: integrate()
+  verifica che esista e che il passo proposto venga davvero eseguito, e in caso
+  contrario lo disattiva con un RuntimeWarning (il risultato resta corretto,
+  cambia solo il costo).
+
+Riporta le valutazioni della RHS risparmiate rispetto allo sweep a freddo e
+l'errore di entrambi gli sweep contro un riferimento DOP853 a rtol=1e-12 su un
+campione di celle (vicino ai wrap di arg() RK45 a rtol può sbagliare di più
+della propria tolleranza: lo sweep a freddo non è la verità).
+
+Autore: Tetcollective collab
+Data: 2026
+"""
+
+import time
+import warnings
+
+import numpy as np
+from scipy.integrate import RK45, OdeSolution, solve_ivp
+
+# --------------------------------------------------
+# Parametri base fissi (come parametric_torque_grid.py)
+# --------------------------------------------------
+phi_offset   = np.pi / 4
+R_tau_phase  = np.exp(-1j * 3 * np.pi / 5)
+t_span       = (0, 60.0)
+t_eval       = np.linspace(t_span[0], t_span[1], 3000)
+mid_idx      = len(t_eval) // 2   # usiamo seconda metà per drift stabile
+rtol, atol   = 1e-8, 1e-10
+
+
+# --------------------------------------------------
+# Funzione dinamica (stessa di prima)
+# --------------------------------------------------
+def theta_dot(t, y, g, omega, golden_scale=1.0):
+    theta = y[0]
+    exponent = 6 * np.sin(3 * t) / np.pi * golden_scale
+    anyon_factor = np.angle(R_tau_phase ** exponent)
+    drive = g * anyon_factor * np.sin(3 * t + phi_offset)
+    return [omega + drive]
+
+
+def drift_of(theta):
+    return np.mean(np.diff(theta[mid_idx:])) / np.mean(np.diff(t_eval[mid_idx:]))
+
+
+# --------------------------------------------------
+# Ordini di visita che preservano la località
+# --------------------------------------------------
+def serpentine_order(shape):
+    n0, n1 = shape
+    return [(i, j if i % 2 == 0 else n1 - 1 - j) for i in range(n0) for j in range(n1)]
+
+
+def _gilbert(x, y, ax, ay, bx, by):
+    """
+    Curva di Hilbert generalizzata (Červený) sul rettangolo con origine (x, y),
+    asse principale (ax, ay) e secondario (bx, by): divide a metà il lato lungo
+    (o in tre parti a "U" se il rettangolo è quasi quadrato), spostando di una
+    cella il taglio dispari perché i pezzi si raccordino fra celle adiacenti.
+    """
+    w, h = abs(ax + ay), abs(bx + by)
+    dax, day, dbx, dby = np.sign(ax), np.sign(ay), np.sign(bx), np.sign(by)
+    if h == 1:
+        return [(x + i * dax, y + i * day) for i in range(w)]
+    if w == 1:
+        return [(x + i * dbx, y + i * dby) for i in range(h)]
+    ax2, ay2, bx2, by2 = ax // 2, ay // 2, bx // 2, by // 2
+    if 2 * w > 3 * h:
+        if abs(ax2 + ay2) % 2 and w > 2:
+            ax2, ay2 = ax2 + dax, ay2 + day
+        return (_gilbert(x, y, ax2, ay2, bx, by)
+                + _gilbert(x + ax2, y + ay2, ax - ax2, ay - ay2, bx, by))
+    if abs(bx2 + by2) % 2 and h > 2:
+        bx2, by2 = bx2 + dbx, by2 + dby
+    return (_gilbert(x, y, bx2, by2, ax2, ay2)
+            + _gilbert(x + bx2, y + by2, ax, ay, bx - bx2, by - by2)
+            + _gilbert(x + (ax - dax) + (bx2 - dbx), y + (ay - day) + (by2 - dby),
+                       -bx2, -by2, -(ax - ax2), -(ay - ay2)))
+
+
+def hilbert_order(shape):
+    """
+    Curva di Hilbert generalizzata a griglie rettangolari qualsiasi: celle
+    consecutive sono sempre adiacenti (con al più un passo in diagonale se un
+    lato è dispari), invece dei salti di un quadrato 2^k tagliato.
+    """
+    n0, n1 = shape
+    cells = _gilbert(0, 0, n0, 0, 0, n1) if n0 >= n1 else _gilbert(0, 0, 0, n1, n0, 0)
+    return [(int(i), int(j)) for i, j in cells]
+
+
+ORDERS = {'serpentine': serpentine_order, 'hilbert': hilbert_order}
+
+
+# --------------------------------------------------
+# Integrazione RK45 con riuso della storia dei passi
+# --------------------------------------------------
+def _history_step(t_grid, t):
+    """Passo che atterra sul prossimo nodo della griglia di passi di riferimento."""
+    k = np.searchsorted(t_grid, t, side='right')
+    if k >= len(t_grid):
+        return None
+    h = t_grid[k] - t
+    if k + 1 < len(t_grid) and h < 0.5 * (t_grid[k] - t_grid[k - 1]):
+        h = t_grid[k + 1] - t
+    return h
+
+
+def integrate(fun, t_grid=None, max_reject_rate=0.25, max_step=np.inf):
+    """
+    RK45 (Dormand–Prince, come solve_ivp) da [0.0]. Con t_grid i passi proposti
+    seguono la griglia accettata di una cella vicina; il controllo d'errore resta
+    quello di RK45. Se la griglia non è adatta (dopo 20 passi, più di
+    max_reject_rate tentativi rifiutati per passo) si torna al controllo
+    di passo standard. max_step come in solve_ivp: serve se la RHS ha impulsi
+    più stretti dei passi che il controllo d'errore sceglierebbe (e salterebbe).
+    Ritorna (θ su t_eval o None, griglia dei passi accettati, nfev).
+    """
+    first = None if t_grid is None else t_grid[1] - t_grid[0]
+    solver = RK45(fun, t_span[0], [0.0], t_span[1], rtol=rtol, atol=atol,
+                  first_step=first, max_step=max_step)
+    if t_grid is not None and not hasattr(solver, 'h_abs'):
+        warnings.warn("RK45 senza attributo h_abs: replay dei passi disattivato",
+                      RuntimeWarning)
+        t_grid = None
+    ts, interpolants = [solver.t], []
+    rejects = 0
+    while solver.status == 'running':
+        h = None
+        if t_grid is not None:
+            h = _history_step(t_grid, solver.t)
+            if h is not None:
+                h = min(h, max_step)
+                solver.h_abs = h
+        t_prev, nfev = solver.t, solver.nfev
+        solver.step()
+        if solver.status == 'failed':
+            return None, None, solver.nfev
+        # ogni tentativo di passo costa n_stages valutazioni (FSAL)
+        rejected = (solver.nfev - nfev) // solver.n_stages - 1
+        rejects += rejected
+        # un passo accettato al primo tentativo deve essere quello proposto
+        # (salvo troncamento a t_bound), altrimenti h_abs non è più rispettato
+        if (h is not None and not rejected and solver.t != t_span[1]
+                and not np.isclose(solver.t - t_prev, h, rtol=1e-9, atol=0)):
+            warnings.warn("RK45 ha ignorato h_abs: replay dei passi disattivato",
+                          RuntimeWarning)
+            t_grid = None
+        if len(ts) >= 20 and rejects > max_reject_rate * len(ts):
+            t_grid = None
+        ts.append(solver.t)
+        interpolants.append(solver.dense_output())
+    theta = OdeSolution(ts, interpolants)(t_eval)[0]
+    return theta, np.array(ts), solver.nfev
+
+
+# --------------------------------------------------
+# Predittore: interpolazione di Newton lungo righe/colonne
+# --------------------------------------------------
+def _newton(xs, ys, x):
+    """Interpolante quadratico di Newton in x e suo termine quadratico."""
+    d01 = (ys[1] - ys[0]) / (xs[1] - xs[0])
+    d12 = (ys[2] - ys[1]) / (xs[2] - xs[1])
+    d012 = (d12 - d01) / (xs[2] - xs[0])
+    correction = (x - xs[0]) * (x - xs[1]) * d012
+    return ys[0] + (x - xs[0]) * d01 + correction, np.abs(correction).max()
+
+
+def _predict(cell, axes, theta, known):
+    """
+    Predizione quadratica di θ(t) nella cella da celle note sulla stessa riga o
+    colonna, solo per interpolazione (mai oltre i nodi che la racchiudono).
+    Con due nodi per lato si usano entrambi gli stencil sbilanciati
+    (l2, l1, r1) e (l1, r1, r2), che devono concordare: un singolo stencil a
+    3 punti col terzo nodo dalla parte "buona" di un cambio di curvatura non
+    se ne accorge.
+    Ritorna (θ_pred, errore normalizzato) con errore = max(termini quadratici,
+    scarto fra stencil) / (atol + rtol max|θ|), cioè la tolleranza di RK45
+    sulla scala della traiettoria; fra riga e colonna vince la più affidabile.
+    """
+    preds = []
+    for dim in (0, 1):
+        line = known[:, cell[1]] if dim == 0 else known[cell[0], :]
+        idx = np.flatnonzero(line)
+        c = cell[dim]
+        left, right = idx[idx < c], idx[idx > c]
+        if len(idx) < 3 or not len(left) or not len(right):
+            continue
+        if len(left) >= 2 and len(right) >= 2:
+            stencils = [(left[-2], left[-1], right[0]), (left[-1], right[0], right[1])]
+        else:
+            rest = np.concatenate([left[:-1], right[1:]])
+            stencils = [(left[-1], right[0], rest[np.argmin(np.abs(rest - c))])]
+        fits = []
+        for nodes in stencils:
+            xs = axes[dim][list(nodes)]
+            ys = [theta[(k, cell[1]) if dim == 0 else (cell[0], k)] for k in nodes]
+            fits.append(_newton(xs, ys, axes[dim][c]))
+        pred = np.mean([f[0] for f in fits], axis=0)
+        spread = max(f[1] for f in fits)
+        if len(fits) == 2:
+            spread = max(spread, np.abs(fits[0][0] - fits[1][0]).max())
+        preds.append((pred, spread))
+    if not preds:
+        return None, np.inf
+    best, spread = min(preds, key=lambda p: p[1])
+    return best, spread / (atol + rtol * np.abs(best).max())
+
+
+# --------------------------------------------------
+# Sweep a freddo e sweep a continuazione
+# --------------------------------------------------
+def cold_sweep(axis0, axis1, rhs, max_step=np.inf):
+    """Confronto: una integrazione indipendente da [0.0] per cella."""
+    grid = np.full((len(axis0), len(axis1)), np.nan)
+    nfev = 0
+    for i, p0 in enumerate(axis0):
+        for j, p1 in enumerate(axis1):
+            theta, _, n = integrate(lambda t, y: rhs(t, y, p0, p1), max_step=max_step)
+            nfev += n
+            if theta is not None:
+                grid[i, j] = drift_of(theta)
+    return grid, {'nfev': nfev, 'integrated': grid.size, 'predicted': 0}
+
+
+def reference_drift(axis0, axis1, rhs, cells):
+    """
+    Drift di riferimento sulle celle indicate: DOP853 con rtol=1e-12, ben più
+    stretto di rtol, per misurare l'errore vero sia dello sweep a freddo sia
+    di quello a continuazione (RK45 a rtol non è di per sé la verità).
+    """
+    ref = np.full(len(cells), np.nan)
+    for k, (i, j) in enumerate(cells):
+        sol = solve_ivp(lambda t, y: rhs(t, y, axis0[i], axis1[j]), t_span, [0.0],
+                        method='DOP853', rtol=1e-12, atol=1e-14, t_eval=t_eval)
+        if sol.success:
+            ref[k] = drift_of(sol.y[0])
+    return ref
+
+
+def _replay_source(cell, is_node, replay_cost):
+    """
+    Cella integrata da cui riprendere la griglia di passi: la più vicina sulla
+    stessa riga o colonna, preferendo la direzione in cui il replay è costato
+    meno finora (replay_cost[dim] = media di nfev_warm / nfev_sorgente).
+    """
+    best, best_key = None, None
+    for dim in (0, 1):
+        line = is_node[:, cell[1]] if dim == 0 else is_node[cell[0], :]
+        idx = np.flatnonzero(line)
+        if len(idx) == 0:
+            continue
+        k = idx[np.argmin(np.abs(idx - cell[dim]))]
+        key = (replay_cost[dim], abs(k - cell[dim]))
+        if best_key is None or key < best_key:
+            best, best_key = ((k, cell[1]) if dim == 0 else (cell[0], k)), key
+    if best is None and is_node.any():
+        nodes = np.argwhere(is_node)
+        best = tuple(nodes[np.argmin(np.abs(nodes - cell).max(axis=1))])
+    return best
+
+
+def _coarse_indices(n, stride):
+    idx = list(range(0, n, stride))
+    if idx[-1] != n - 1:
+        idx.append(n - 1)
+    return set(idx)
+
+
+def continuation_sweep(axis0, axis1, rhs, order='hilbert', stride=3, tol_factor=1e3,
+                       check_every=16, max_step=np.inf):
+    """
+    Sweep della griglia axis0 × axis1 con rhs(t, y, p0, p1), in due passate
+    nello stesso ordine di visita:
+    1. sottogriglia grossolana (ogni stride celle, bordi inclusi) integrata
+       con warm start dalla cella integrata vicina;
+    2. le celle restanti sono interpolate dalle celle note che le racchiudono se
+       l'errore stimato è < tol_factor volte la tolleranza di RK45 (il default
+       è dell'ordine dell'errore globale su ~1e3 passi, cioè del rumore fra
+       integrazioni a freddo); altrimenti integrate, diventando nuovi nodi.
+       La stima dagli stencil non vede un punto non liscio fra due nodi, quindi
+       una predizione accettata ogni check_every viene verificata integrando
+       la cella: se la predizione manca la tolleranza si integrano anche le
+       celle predette adiacenti e la verifica diventa due volte più fitta.
+    max_step è passato a ogni integrazione, come in cold_sweep.
+    Ritorna la griglia di drift e {'nfev', 'integrated', 'predicted',
+    'checked', 'failed', 'drift_tol'}, dove drift_tol è lo scarto di drift
+    corrispondente a tol_factor volte la tolleranza di RK45 sulla traiettoria.
+    """
+    axes = (np.asarray(axis0, dtype=float), np.asarray(axis1, dtype=float))
+    shape = (len(axes[0]), len(axes[1]))
+    theta = np.zeros(shape + (len(t_eval),))
+    is_node = np.zeros(shape, dtype=bool)
+    step_grids, node_nfev = {}, {}
+    replay_cost = [1.0, 1.0]
+    grid = np.full(shape, np.nan)
+    is_pred = np.zeros(shape, dtype=bool)
+    stats = {'nfev': 0, 'integrated': 0, 'predicted': 0, 'checked': 0, 'failed': 0}
+
+    def solve(cell):
+        source = _replay_source(cell, is_node, replay_cost)
+        p0, p1 = axes[0][cell[0]], axes[1][cell[1]]
+        sol, ts, n = integrate(lambda t, y: rhs(t, y, p0, p1), step_grids.get(source),
+                               max_step=max_step)
+        stats['nfev'] += n
+        stats['integrated'] += 1
+        if source is not None and (source[0] == cell[0]) != (source[1] == cell[1]):
+            dim = 0 if source[1] == cell[1] else 1
+            replay_cost[dim] = 0.5 * replay_cost[dim] + 0.5 * n / node_nfev[source]
+        if sol is not None:
+            theta[cell] = sol
+            is_node[cell] = True
+            step_grids[cell] = ts
+            node_nfev[cell] = n
+            grid[cell] = drift_of(sol)
+
+    rows, cols = _coarse_indices(shape[0], stride), _coarse_indices(shape[1], stride)
+    walk = ORDERS[order](shape)
+    for cell in walk:
+        if cell[0] in rows and cell[1] in cols:
+            solve(cell)
+
+    # prima le celle su righe/colonne grossolane (racchiuse da nodi integrati),
+    # poi le restanti, che possono appoggiarsi anche alle celle già predette
+    known = is_node.copy()
+    accepted = 0
+    for on_coarse_line in (True, False):
+        for cell in walk:
+            if known[cell] or (cell[0] in rows or cell[1] in cols) != on_coarse_line:
+                continue
+            known[cell] = True
+            pred, err = _predict(cell, axes, theta, known)
+            if pred is None or err > tol_factor:
+                solve(cell)
+                continue
+            accepted += 1
+            if accepted % check_every:
+                theta[cell] = pred
+                grid[cell] = drift_of(pred)
+                is_pred[cell] = True
+                stats['predicted'] += 1
+                continue
+            # verifica a campione: la cella viene integrata e confrontata
+            solve(cell)
+            stats['checked'] += 1
+            miss = np.abs(theta[cell] - pred).max() / (atol + rtol * np.abs(pred).max())
+            if miss <= tol_factor:
+                continue
+            stats['failed'] += 1
+            check_every = max(1, check_every // 2)
+            for i in range(max(cell[0] - 1, 0), min(cell[0] + 2, shape[0])):
+                for j in range(max(cell[1] - 1, 0), min(cell[1] + 2, shape[1])):
+                    if is_pred[i, j]:
+                        is_pred[i, j] = False
+                        stats['predicted'] -= 1
+                        solve((i, j))
+    # θ(T) − θ(t_mid) sbaglia al più di due volte l'errore su θ
+    scale = atol + rtol * np.abs(theta).max()
+    stats['drift_tol'] = 2 * tol_factor * scale / (t_eval[-1] - t_eval[mid_idx])
+    return grid, stats
+
+
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    # --------------------------------------------------
+    # Griglie fini (4× le celle di parametric_torque_grid.py)
+    # --------------------------------------------------
+    g_values     = np.linspace(0.1, 1.8, 36)
+    omega_values = np.logspace(np.log10(1e8), np.log10(5e9), 32)
+    golden_f     = np.linspace(0.80, 1.20, 22)
+    omega_fixed  = np.median(omega_values)
+
+    # (asse 0, asse 1, rhs, max_step)
+    sweeps = {
+        'g × ω': (g_values, omega_values,
+                  lambda t, y, g, omega: theta_dot(t, y, g, omega, golden_scale=1.0), np.inf),
+        'g × aurea': (g_values, golden_f,
+                      lambda t, y, g, gf: theta_dot(t, y, g, omega_fixed, golden_scale=gf),
+                      np.inf),
+        # regime a ω piccolo: la RHS è discontinua (wrap di arg) e domina il costo.
+        # Appena sopra gs = 5π/18 la fase supera π solo attorno a sin(3t) = ±1:
+        # impulsi larghi ~0.06 che RK45 a passo libero può scavalcare per intero
+        'g × aurea (ω = 1 rad/s)': (g_values, golden_f,
+                                    lambda t, y, g, gf: theta_dot(t, y, g, 1.0, golden_scale=gf),
+                                    0.05),
+    }
+
+    rng = np.random.default_rng(0)
+    results = {}
+    for name, (ax0, ax1, rhs, max_step) in sweeps.items():
+        t0 = time.time()
+        cold, cold_stats = cold_sweep(ax0, ax1, rhs, max_step=max_step)
+        t1 = time.time()
+        cont, cont_stats = continuation_sweep(ax0, ax1, rhs, max_step=max_step)
+        t2 = time.time()
+        saved = cold_stats['nfev'] - cont_stats['nfev']
+        print(f"[{name}] RHS: freddo {cold_stats['nfev']}, continuazione {cont_stats['nfev']} "
+              f"(risparmiate {saved}, ×{cold_stats['nfev'] / cont_stats['nfev']:.1f}); "
+              f"celle integrate {cont_stats['integrated']}, predette {cont_stats['predicted']} "
+              f"(verificate {cont_stats['checked']}, fallite {cont_stats['failed']}); "
+              f"tempo {t1 - t0:.1f} s → {t2 - t1:.1f} s")
+
+        # accuratezza contro il riferimento stretto: le 16 celle dove freddo e
+        # continuazione differiscono di più, più 16 a caso
+        gap = np.nan_to_num(np.abs(cont - cold), nan=np.inf).ravel()
+        worst = np.argsort(gap)[-16:]
+        others = rng.choice(np.setdiff1d(np.arange(gap.size), worst), 16, replace=False)
+        cells = [np.unravel_index(k, cont.shape) for k in np.concatenate([worst, others])]
+        ref = reference_drift(ax0, ax1, rhs, cells)
+        err_cont = np.max(np.abs([cont[c] for c in cells] - ref))
+        err_cold = np.max(np.abs([cold[c] for c in cells] - ref))
+        print(f"    max |Δdrift| vs DOP853 (rtol 1e-12) su {len(cells)} celle: "
+              f"continuazione {err_cont:.2e}, freddo {err_cold:.2e}, "
+              f"tolleranza {cont_stats['drift_tol']:.2e}")
+        assert err_cont <= cont_stats['drift_tol'], f"{name}: |Δdrift| {err_cont:.2e} fuori tolleranza"
+        results[name] = (ax0, ax1, cont)
+
+    # --------------------------------------------------
+    # Plot: torque netto dallo sweep a continuazione
+    # --------------------------------------------------
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5.8))
+
+    im1 = ax1.contourf(omega_values / 1e9, g_values, results['g × ω'][2] / 1e9,
+                       levels=18, cmap='viridis')
+    fig.colorbar(im1, ax=ax1, label='Torque netto medio [Grad/s]')
+    ax1.set_xscale('log')
+    ax1.set_xlabel('ω base [GHz]')
+    ax1.set_ylabel('Coupling g')
+    ax1.set_title('Torque netto vs g e ω (continuazione)')
+
+    im2 = ax2.contourf(golden_f, g_values, results['g × aurea (ω = 1 rad/s)'][2],
+                       levels=18, cmap='magma')
+    fig.colorbar(im2, ax=ax2, label='Drift medio [rad/s]')
+    ax2.axvline(1.0, color='white', ls='--', alpha=0.75, label='φ = 1 (aurea)')
+    ax2.set_xlabel('Fattore scala aurea')
+    ax2.set_ylabel('Coupling g')
+    ax2.set_title('Drift vs g e aurea (ω = 1 rad/s, continuazione)')
+    ax2.legend()
+
+    plt.tight_layout()
+    plt.savefig('torque_parametric_continuation.png', dpi=160, bbox_inches='tight')
+    plt.show()